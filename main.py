@@ -5,18 +5,28 @@ from fastapi.responses import FileResponse, JSONResponse
 from fastapi.exceptions import RequestValidationError
 from pydantic import BaseModel, HttpUrl
 from website_analyzer import WebsiteAnalyzer
+from resources import ResourceManager, ShuttingDownError
+from contextlib import asynccontextmanager
 import asyncio
 from typing import Dict, Optional
 import os
 import logging
 import aiohttp
-from bs4 import BeautifulSoup
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Website Analyzer API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Shared HTTP clients live for the whole app and are drained on shutdown
+    resources = ResourceManager()
+    await resources.start()
+    app.state.resources = resources
+    yield
+    await resources.shutdown()
+
+app = FastAPI(title="Website Analyzer API", lifespan=lifespan)
 
 # Configure CORS
 app.add_middleware(
@@ -61,36 +71,43 @@ async def general_exception_handler(request: Request, exc: Exception):
 async def read_root():
     return FileResponse("static/index.html")
 
-async def fetch_website_content(url: str) -> tuple[str, bool]:
+async def fetch_website_content(url: str, session: aiohttp.ClientSession) -> tuple[str, bool]:
     """Fetch website content and return (content, is_blocked)"""
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(str(url), timeout=30) as response:
-                if response.status != 200:
-                    return None, True
-                
-                content = await response.text()
-                logger.info(f"Fetched content length: {len(content)} bytes")
-                
-                # Check for common bot protection indicators
-                soup = BeautifulSoup(content, 'html.parser')
-                if any(indicator in content.lower() for indicator in [
-                    'captcha', 'cloudflare', 'security check', 'bot protection',
-                    'please wait', 'verifying you are human'
-                ]):
-                    logger.warning("Bot protection detected")
-                    return None, True
-                
-                return content, False
+        async with session.get(str(url), timeout=aiohttp.ClientTimeout(total=30)) as response:
+            if response.status != 200:
+                return None, True
+            
+            content = await response.text()
+            logger.info(f"Fetched content length: {len(content)} bytes")
+            
+            # Check for common bot protection indicators
+            if any(indicator in content.lower() for indicator in [
+                'captcha', 'cloudflare', 'security check', 'bot protection',
+                'please wait', 'verifying you are human'
+            ]):
+                logger.warning("Bot protection detected")
+                return None, True
+            
+            return content, False
     except Exception as e:
         logger.error(f"Error fetching website: {str(e)}")
         return None, True
 
 @app.post("/analyze")
 async def analyze_website(request: AnalysisRequest):
+    resources = app.state.resources
+    try:
+        if resources.draining:
+            raise ShuttingDownError("Server is shutting down")
+        return await _run_analysis(request, resources)
+    except ShuttingDownError:
+        raise HTTPException(status_code=503, detail="Server is shutting down")
+
+async def _run_analysis(request: AnalysisRequest, resources: ResourceManager):
     try:
         # Fetch website content
-        content, is_blocked = await fetch_website_content(request.url)
+        content, is_blocked = await fetch_website_content(request.url, resources.aiohttp_session)
         
         if is_blocked or not content:
             return AnalysisResponse(
@@ -102,11 +119,17 @@ async def analyze_website(request: AnalysisRequest):
             )
         
         # Create analyzer instance with required arguments
-        analyzer = WebsiteAnalyzer(str(request.url), use_ai=request.use_ai)
+        def run():
+            analyzer = WebsiteAnalyzer(str(request.url), use_ai=request.use_ai,
+                                       session=resources.requests_session)
+            try:
+                return analyzer.run_analysis()
+            finally:
+                analyzer.close()
         
-        # Run analysis
+        # Run analysis on the bounded worker pool; it blocks on HTTP and Selenium
         logger.info("Starting website analysis...")
-        results = analyzer.run_analysis()
+        results = await resources.run_analysis(run)
         logger.info(f"Analysis results: {results}")
         
         # Ensure all required keys are present
@@ -118,10 +141,29 @@ async def analyze_website(request: AnalysisRequest):
         logger.info(f"Final response: {results}")
         return AnalysisResponse(**results)
         
+    except ShuttingDownError:
+        raise
     except Exception as e:
         logger.error(f"Analysis error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/drain")
+async def drain():
+    """Stop accepting analyses before the server is stopped; in-flight ones finish"""
+    resources = app.state.resources
+    resources.drain()
+    return resources.stats()
+
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"} 
\ No newline at end of file
+    resources = app.state.resources
+    if resources.draining:
+        # 503 tells load balancers to stop routing new traffic here
+        return JSONResponse(
+            status_code=503,
+            content={"status": "draining", "resources": resources.stats()},
+        )
+    return {
+        "status": "healthy",
+        "resources": resources.stats()
+    } 
\ No newline at end of file
@@ -0,0 +1,207 @@
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import argparse
+import gzip
+import json
+import logging
+import mmap
+import os
+import re
+import zlib
+
+from bs4 import UnicodeDammit
+
+from website_analyzer import WebsiteAnalyzer
+
+logger = logging.getLogger(__name__)
+
+HTML_SUFFIXES = ('.html', '.htm')
+WARC_SUFFIXES = ('.warc', '.warc.gz')
+
+# (url, html, response headers)
+Page = Tuple[str, str, Dict[str, str]]
+
+
+def _parse_headers(lines: List[bytes]) -> Dict[str, str]:
+    """Parse raw 'Name: value' header lines into a dict"""
+    headers = {}
+    for line in lines:
+        name, sep, value = line.decode('latin-1').partition(':')
+        if sep:
+            headers[name.strip().lower()] = value.strip()
+    return headers
+
+
+def _read_header_block(stream) -> Optional[List[bytes]]:
+    """Read a WARC header block up to the blank line; None at end of stream"""
+    lines = []
+    while True:
+        line = stream.readline()
+        if not line:
+            return lines or None
+        line = line.rstrip(b'\r\n')
+        if not lines:
+            # Skip padding between records, and resync after a bad one, up to the next version line
+            if line.startswith(b'WARC/'):
+                lines.append(line)
+            continue
+        if not line:
+            return lines
+        lines.append(line)
+
+
+def _dechunk(body: bytes) -> bytes:
+    """Undo chunked transfer encoding"""
+    chunks = []
+    pos = 0
+    while True:
+        line_end = body.find(b'\r\n', pos)
+        if line_end == -1:
+            break
+        size = int(body[pos:line_end].split(b';')[0] or b'0', 16)
+        if size == 0:
+            break
+        chunks.append(body[line_end + 2:line_end + 2 + size])
+        pos = line_end + 2 + size + 2
+    return b''.join(chunks)
+
+
+def _decode_body(body: bytes, content_type: str) -> str:
+    """Decode an HTTP body, preferring the Content-Type charset, then <meta charset>"""
+    match = re.search(r'charset=["\']?([\w-]+)', content_type, re.I)
+    known = [match.group(1)] if match else []
+    return UnicodeDammit(body, known_definite_encodings=known, is_html=True).unicode_markup or ''
+
+
+def _decompress(body: bytes, encoding: str) -> bytes:
+    """Undo a Content-Encoding; raises ValueError for unsupported ones"""
+    if encoding in ('', 'identity'):
+        return body
+    if encoding in ('gzip', 'x-gzip'):
+        return gzip.decompress(body)
+    if encoding == 'deflate':
+        try:
+            return zlib.decompress(body)
+        except zlib.error:
+            # Some servers send raw deflate without the zlib header
+            return zlib.decompress(body, -zlib.MAX_WBITS)
+    raise ValueError(f"unsupported content-encoding '{encoding}'")
+
+
+def _iter_warc_records(stream) -> Iterator[Page]:
+    """Yield HTML responses from a WARC stream, one record at a time"""
+    while True:
+        warc_lines = _read_header_block(stream)
+        if warc_lines is None:
+            return
+        warc_headers = _parse_headers(warc_lines[1:])
+        url = warc_headers.get('warc-target-uri', '')
+        try:
+            length = int(warc_headers.get('content-length', 0))
+        except ValueError:
+            logger.warning(f"Skipping record with bad Content-Length: {url}")
+            continue
+        block = stream.read(length)
+        if (warc_headers.get('warc-type') != 'response'
+                or 'application/http' not in warc_headers.get('content-type', '')):
+            continue
+
+        # Some crawlers write LF-only HTTP headers; the body may still contain either separator
+        crlf, lf = block.find(b'\r\n\r\n'), block.find(b'\n\n')
+        separator = b'\r\n\r\n' if crlf != -1 and (lf == -1 or crlf < lf) else b'\n\n'
+        head, _, body = block.partition(separator)
+        head_lines = head.splitlines()
+        status = head_lines[0].split() if head_lines else []
+        if len(status) < 2 or not status[0].startswith(b'HTTP/'):
+            logger.warning(f"Skipping response record with unparseable HTTP status line: {url}")
+            continue
+        if status[1] != b'200':
+            continue
+        http_headers = _parse_headers(head_lines[1:])
+        content_type = http_headers.get('content-type', '')
+        if 'html' not in content_type.lower():
+            continue
+        # Archived bodies are stored as sent on the wire; one bad record must not end the run
+        try:
+            if 'chunked' in http_headers.get('transfer-encoding', '').lower():
+                body = _dechunk(body)
+            body = _decompress(body, http_headers.get('content-encoding', '').strip().lower())
+            html = _decode_body(body, content_type)
+        except (ValueError, OSError, EOFError, zlib.error) as e:
+            logger.warning(f"Skipping undecodable record {url}: {str(e)}")
+            continue
+        yield url, html, http_headers
+
+
+def iter_warc(path: Path) -> Iterator[Page]:
+    """Stream HTML pages from a .warc (memory-mapped) or .warc.gz archive"""
+    if path.name.lower().endswith('.gz'):
+        with gzip.open(path, 'rb') as stream:
+            yield from _iter_warc_records(stream)
+        return
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as stream:
+            yield from _iter_warc_records(stream)
+
+
+def iter_pages(paths: Iterable[str]) -> Iterator[Page]:
+    """Yield pages from HTML files, WARC archives and directories of either"""
+    for raw_path in paths:
+        path = Path(raw_path)
+        if not path.exists():
+            logger.warning(f"Skipping missing input: {path}")
+        elif path.is_dir():
+            yield from iter_pages(str(p) for p in sorted(path.rglob('*'))
+                                  if p.is_file() and p.name.lower().endswith(WARC_SUFFIXES + HTML_SUFFIXES))
+        elif path.name.lower().endswith(WARC_SUFFIXES):
+            yield from iter_warc(path)
+        elif path.name.lower().endswith(HTML_SUFFIXES):
+            # Let BeautifulSoup detect the encoding from <meta charset> or the bytes themselves
+            html = UnicodeDammit(path.read_bytes(), is_html=True).unicode_markup or ''
+            yield path.resolve().as_uri(), html, {}
+        else:
+            logger.warning(f"Skipping unsupported input: {path}")
+
+
+def analyze_page(page: Page) -> Dict:
+    """Run the UX/SEO/performance checks on a stored page"""
+    url, html, headers = page
+    try:
+        return WebsiteAnalyzer(url, html=html, headers=headers).run_analysis()
+    except Exception as e:
+        logger.error(f"Error analyzing {url}: {str(e)}")
+        return {"error": f"Analysis failed: {str(e)}", "url": url}
+
+
+def analyze_offline(paths: Iterable[str], workers: Optional[int] = None) -> Iterator[Dict]:
+    """Analyze stored pages across a process pool, yielding results in input order"""
+    workers = workers or os.cpu_count() or 1
+    # Bound the number of pages in flight so large archives are never fully loaded
+    max_pending = workers * 4
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for page in iter_pages(paths):
+            pending.append(executor.submit(analyze_page, page))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze saved HTML files or WARC archives offline")
+    parser.add_argument('paths', nargs='+', help="HTML files, .warc/.warc.gz archives or directories")
+    parser.add_argument('--workers', type=int, default=None, help="Number of worker processes")
+    args = parser.parse_args()
+
+    # One JSON result per line
+    for result in analyze_offline(args.paths, workers=args.workers):
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
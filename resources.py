@@ -0,0 +1,170 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+from http.cookiejar import DefaultCookiePolicy
+import asyncio
+import logging
+import threading
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+
+class ShuttingDownError(RuntimeError):
+    """Raised when an analysis is started while the server is draining"""
+
+
+class ResourceManager:
+    """Owns the pooled HTTP clients shared by all analyses for the app's lifetime"""
+
+    def __init__(self, pool_size: int = 100, pool_size_per_host: int = 20,
+                 dns_cache_ttl: int = 300, keepalive_timeout: float = 30,
+                 drain_timeout: float = 30, max_concurrent_analyses: int = 4):
+        self.pool_size = pool_size
+        self.pool_size_per_host = pool_size_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.drain_timeout = drain_timeout
+        self.max_concurrent_analyses = max_concurrent_analyses
+        self.aiohttp_session: Optional[aiohttp.ClientSession] = None
+        self.requests_session: Optional[requests.Session] = None
+        # Each analysis may drive its own Chrome instance, so cap how many run at once
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.draining = False
+        self.in_flight = 0
+        self.running = 0
+        self.completed = 0
+        self._running_lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    async def start(self):
+        """Create the shared HTTP clients and the analysis worker pool"""
+        self._loop = asyncio.get_running_loop()
+        self.executor = ThreadPoolExecutor(max_workers=self.max_concurrent_analyses,
+                                           thread_name_prefix='analysis')
+        # aiohttp speaks HTTP/1.1 only; reuse comes from keep-alive and the DNS cache
+        connector = aiohttp.TCPConnector(
+            limit=self.pool_size,
+            limit_per_host=self.pool_size_per_host,
+            ttl_dns_cache=self.dns_cache_ttl,
+            keepalive_timeout=self.keepalive_timeout,
+        )
+        # Only connections are shared: cookies would leak state between users' analyses
+        self.aiohttp_session = aiohttp.ClientSession(connector=connector,
+                                                     cookie_jar=aiohttp.DummyCookieJar())
+
+        # Used by WebsiteAnalyzer, which runs in worker threads
+        self.requests_session = requests.Session()
+        self.requests_session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size_per_host)
+        self.requests_session.mount('http://', adapter)
+        self.requests_session.mount('https://', adapter)
+        logger.info("HTTP connection pools started")
+
+    def _call(self, func: Callable):
+        """Run an analysis on a worker thread, counting it as running"""
+        with self._running_lock:
+            self.running += 1
+        try:
+            return func()
+        finally:
+            with self._running_lock:
+                self.running -= 1
+
+    def _finished(self, future):
+        """Executor callback; may run on a worker thread"""
+        try:
+            self._loop.call_soon_threadsafe(self._release)
+        except RuntimeError:
+            pass  # event loop already closed
+
+    def _release(self):
+        self.in_flight -= 1
+        self.completed += 1
+        if self.in_flight == 0:
+            self._idle.set()
+
+    async def run_analysis(self, func: Callable):
+        """Run a blocking analysis on the worker pool; refuses new work while draining
+
+        The analysis counts as in flight until its thread finishes, even if the
+        awaiting request is cancelled, so shutdown never closes clients under it.
+        """
+        if self.draining:
+            raise ShuttingDownError("Server is shutting down")
+        self.in_flight += 1
+        self._idle.clear()
+        future = self.executor.submit(self._call, func)
+        future.add_done_callback(self._finished)
+        return await asyncio.shield(asyncio.wrap_future(future))
+
+    def drain(self):
+        """Stop accepting new analyses; in-flight ones keep running"""
+        if not self.draining:
+            logger.info(f"Draining started with {self.in_flight} in-flight analyses")
+        self.draining = True
+
+    async def shutdown(self):
+        """Stop accepting analyses, wait for in-flight ones, then close the pools"""
+        self.drain()
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout=self.drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Drain timed out with {self.in_flight} analyses still running")
+        logger.info(f"Pool utilization at shutdown: {self.stats()}")
+
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+        if self.aiohttp_session:
+            await self.aiohttp_session.close()
+        # Analysis threads that outlived the drain timeout still hold the requests session
+        if self.requests_session and self.running == 0:
+            self.requests_session.close()
+            logger.info("HTTP connection pools closed")
+        elif self.requests_session:
+            logger.warning(f"Leaving requests session open for {self.running} running analyses")
+
+    def stats(self) -> Dict:
+        """Report analysis counts and connection pool utilization
+
+        The requests counters cover live host pools only; evicted pools take
+        their counts with them.
+        """
+        aiohttp_stats = {}
+        if self.aiohttp_session and not self.aiohttp_session.closed:
+            connector = self.aiohttp_session.connector
+            aiohttp_stats = {
+                "limit": connector.limit,
+                "limit_per_host": connector.limit_per_host,
+                "active_connections": len(getattr(connector, '_acquired', ())),
+            }
+
+        requests_stats = {}
+        if self.requests_session:
+            adapter = self.requests_session.get_adapter('https://')
+            pools = adapter.poolmanager.pools
+            # Snapshot without touching LRU order; worker threads may evict pools concurrently
+            with pools.lock:
+                host_pools = list(pools._container.values())
+            # requests_sent well above connections_opened means keep-alive is being reused
+            requests_stats = {
+                "host_pools": len(host_pools),
+                "pool_maxsize": self.pool_size_per_host,
+                "connections_opened": sum(pool.num_connections for pool in host_pools),
+                "requests_sent": sum(pool.num_requests for pool in host_pools),
+            }
+
+        return {
+            "draining": self.draining,
+            "in_flight": self.in_flight,
+            "running": self.running,
+            "queued": max(self.in_flight - self.running, 0),
+            "max_concurrent_analyses": self.max_concurrent_analyses,
+            "completed": self.completed,
+            "aiohttp": aiohttp_stats,
+            "requests": requests_stats,
+        }
@@ -0,0 +1,102 @@
+import gzip
+import zlib
+
+from offline_analyzer import analyze_page, iter_pages
+
+
+def warc_record(http: bytes, warc_type: str = 'response', url: str = 'http://example.com/',
+                content_length: str = None) -> bytes:
+    """Build a single WARC record around a raw HTTP message"""
+    content_type = 'application/http; msgtype=response' if warc_type == 'response' else 'application/warc-fields'
+    length = content_length if content_length is not None else str(len(http))
+    head = (f"WARC/1.0\r\nWARC-Type: {warc_type}\r\nWARC-Target-URI: {url}\r\n"
+            f"Content-Type: {content_type}\r\nContent-Length: {length}\r\n\r\n")
+    return head.encode() + http + b"\r\n\r\n"
+
+
+def http_response(body: bytes, headers: str = 'Content-Type: text/html; charset=utf-8',
+                  status: str = '200 OK', newline: bytes = b'\r\n') -> bytes:
+    head = [f"HTTP/1.1 {status}".encode()] + [h.encode() for h in headers.split('\n') if h]
+    return newline.join(head) + newline + newline + body
+
+
+def chunked(data: bytes) -> bytes:
+    half = len(data) // 2
+    parts = [data[:half], data[half:]]
+    return b''.join(b'%x\r\n' % len(p) + p + b'\r\n' for p in parts) + b'0\r\n\r\n'
+
+
+def test_warc_records(tmp_path):
+    html = b'<html><title>caf\xc3\xa9</title></html>'
+    records = [
+        warc_record(b'software: test\r\n', warc_type='warcinfo'),
+        warc_record(http_response(b'<p>lost</p>'), url='http://bad-length/', content_length='abc'),
+        warc_record(http_response(chunked(gzip.compress(html)),
+                                  'Content-Type: text/html; charset=utf-8\nTransfer-Encoding: chunked\n'
+                                  'Content-Encoding: gzip'), url='http://chunked-gzip/'),
+        warc_record(http_response(zlib.compress(html), 'Content-Type: text/html; charset=utf-8\n'
+                                  'Content-Encoding: deflate'), url='http://deflate/'),
+        warc_record(http_response(b'\x8b\x03\x80binary', 'Content-Type: text/html\nContent-Encoding: br'),
+                    url='http://brotli/'),
+        warc_record(http_response(gzip.compress(html)[:10], 'Content-Type: text/html\nContent-Encoding: gzip'),
+                    url='http://truncated/'),
+        warc_record(http_response(b'<p>a</p>\r\n\r\n<p>b</p>', 'Content-Type: text/html', newline=b'\n'),
+                    url='http://lf-only/'),
+        warc_record(http_response(b'<meta charset="windows-1252"><p>caf\xe9</p>', 'Content-Type: text/html'),
+                    url='http://meta-charset/'),
+        warc_record(http_response(b'<p>gone</p>', status='404 Not Found'), url='http://not-found/'),
+        warc_record(http_response(b'{}', 'Content-Type: application/json'), url='http://json/'),
+        warc_record(http_response(html), url='http://plain/'),
+    ]
+    path = tmp_path / 'crawl.warc'
+    path.write_bytes(b''.join(records))
+
+    pages = {url: (body, headers) for url, body, headers in iter_pages([str(path)])}
+
+    assert list(pages) == ['http://chunked-gzip/', 'http://deflate/', 'http://lf-only/',
+                           'http://meta-charset/', 'http://plain/']
+    assert pages['http://chunked-gzip/'][0] == html.decode()
+    assert pages['http://chunked-gzip/'][1]['content-encoding'] == 'gzip'
+    assert pages['http://deflate/'][0] == html.decode()
+    assert pages['http://lf-only/'][0] == '<p>a</p>\r\n\r\n<p>b</p>'
+    assert pages['http://meta-charset/'][0] == '<meta charset="windows-1252"><p>caf\xe9</p>'
+    assert pages['http://plain/'][0] == html.decode()
+
+
+def test_gzipped_warc_suffix_is_case_insensitive(tmp_path):
+    path = tmp_path / 'CRAWL.WARC.GZ'
+    path.write_bytes(gzip.compress(warc_record(http_response(b'<p>hi</p>'))))
+
+    assert [url for url, _, _ in iter_pages([str(path)])] == ['http://example.com/']
+
+
+def test_html_files_and_directories(tmp_path):
+    (tmp_path / 'legacy.html').write_bytes(b'<html><head><meta charset="windows-1252"></head>'
+                                           b'<body><p>caf\xe9</p></body></html>')
+    (tmp_path / 'notes.txt').write_text('not a page')
+
+    pages = list(iter_pages([str(tmp_path), str(tmp_path / 'missing.warc'), str(tmp_path / 'notes.txt')]))
+
+    assert len(pages) == 1
+    url, html, headers = pages[0]
+    assert url == (tmp_path / 'legacy.html').resolve().as_uri()
+    assert 'caf\xe9' in html
+    assert headers == {}
+
+
+def test_analyze_page_is_offline_and_deterministic():
+    html = ('<html><head><title>t</title><meta name="description" content="d"></head>'
+            '<body><header></header><main><h1>Hi</h1><p>one two three</p>'
+            '<a href="/about">About</a><img src="x.png" alt="x"></main><footer></footer></body></html>')
+    page = ('http://example.com/', html, {'Content-Encoding': 'gzip', 'Cache-Control': 'max-age=60'})
+
+    result = analyze_page(page)
+
+    assert result == analyze_page(page)
+    assert result['url'] == 'http://example.com/'
+    assert result['ux_analysis']['navigation']['broken_links'] == []
+    assert result['seo_analysis']['meta_tags']['has_description'] is True
+    performance = result['performance_analysis']
+    assert performance['load_time'] == 'n/a'
+    assert performance['optimization_features']['compression_enabled'] is True
+    assert performance['score'] == 100
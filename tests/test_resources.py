@@ -0,0 +1,37 @@
+import asyncio
+import threading
+
+import pytest
+
+from resources import ResourceManager, ShuttingDownError
+
+
+def test_analysis_counts_until_thread_finishes():
+    async def scenario():
+        resources = ResourceManager(max_concurrent_analyses=1, drain_timeout=5)
+        await resources.start()
+        release = threading.Event()
+
+        task = asyncio.create_task(resources.run_analysis(release.wait))
+        queued = asyncio.create_task(resources.run_analysis(lambda: 'queued'))
+        await asyncio.sleep(0.1)
+        assert resources.stats()['running'] == 1
+        assert resources.stats()['queued'] == 1
+
+        # A cancelled request must not release its slot while the thread still runs
+        task.cancel()
+        await asyncio.sleep(0.1)
+        assert resources.in_flight == 2
+
+        resources.drain()
+        with pytest.raises(ShuttingDownError):
+            await resources.run_analysis(lambda: None)
+
+        release.set()
+        assert await queued == 'queued'
+        await resources.shutdown()
+        return resources
+
+    resources = asyncio.run(scenario())
+    assert resources.in_flight == 0
+    assert resources.completed == 2
@@ -6,13 +6,14 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from webdriver_manager.chrome import ChromeDriverManager
 import time
-from typing import Dict, List
+from typing import Dict, List, Mapping, Optional
 import json
 import logging
 from urllib.parse import urlparse
 import os
 from dotenv import load_dotenv
 import platform
+from requests.structures import CaseInsensitiveDict
 
 # Configure logging
 logging.basicConfig(
@@ -25,13 +26,26 @@ logger = logging.getLogger(__name__)
 load_dotenv()
 
 class WebsiteAnalyzer:
-    def __init__(self, url: str, use_ai: bool = False):
-        self.url = self._normalize_url(url)
+    def __init__(self, url: str, use_ai: bool = False, html: Optional[str] = None,
+                 headers: Optional[Mapping[str, str]] = None,
+                 session: Optional[requests.Session] = None):
+        """Set up the analyzer; pass `html` (and stored response `headers`) to analyze a saved page offline"""
+        self.offline = html is not None
+        self.url = url if self.offline else self._normalize_url(url)
         self.soup = None
         self.page_content = None
+        self.response_headers = CaseInsensitiveDict(headers or {})
         self.driver = None
         self.use_ai = use_ai
-        self.load_page_content()
+        # A shared session keeps connections alive across analyses; otherwise use our own.
+        # Stored pages never touch the network, so they get no session at all
+        self._owns_session = session is None and not self.offline
+        self.session = requests.Session() if self._owns_session else session
+        if self.offline:
+            self.page_content = html
+            self.soup = BeautifulSoup(html, 'html.parser')
+        else:
+            self.load_page_content()
         if self.page_content:
             logger.info(f"Fetched HTML content length: {len(self.page_content)} bytes")
             if len(self.page_content) < 1000:
@@ -87,7 +101,7 @@ class WebsiteAnalyzer:
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
             }
-            response = requests.get(self.url, headers=headers, timeout=10)
+            response = self.session.get(self.url, headers=headers, timeout=10)
             response.raise_for_status()
             self.page_content = response.text
             self.soup = BeautifulSoup(self.page_content, 'html.parser')
@@ -108,13 +122,24 @@ class WebsiteAnalyzer:
             self.page_content = None
             self.soup = None
 
-    def __del__(self):
-        """Cleanup Selenium WebDriver"""
-        if hasattr(self, 'driver') and self.driver:
+    def close(self):
+        """Quit the Selenium WebDriver and close any session we created"""
+        if getattr(self, 'driver', None):
             try:
                 self.driver.quit()
             except:
                 pass
+            self.driver = None
+        if getattr(self, '_owns_session', False):
+            try:
+                self.session.close()
+            except:
+                pass
+            self._owns_session = False
+
+    def __del__(self):
+        """Fallback cleanup if close() was never called"""
+        self.close()
 
     def create_ux_agent(self) -> Agent:
         """Create the UX analysis agent"""
@@ -198,12 +223,13 @@ class WebsiteAnalyzer:
         try:
             nav_links = self.soup.find_all('a')
             broken_links = []
-            for link in nav_links:
+            # Stored pages are analyzed without network access, so links are not probed
+            for link in ([] if self.offline else nav_links):
                 href = link.get('href')
                 if href and not href.startswith(('http', '#', 'mailto:', 'tel:')):
                     try:
                         full_url = self._normalize_url(href)
-                        response = requests.head(full_url, timeout=5)
+                        response = self.session.head(full_url, timeout=5)
                         if response.status_code >= 400:
                             broken_links.append(href)
                     except:
@@ -441,22 +467,31 @@ class WebsiteAnalyzer:
     def analyze_performance(self) -> Dict:
         """Analyze website performance"""
         try:
-            start_time = time.time()
-            response = requests.get(self.url, timeout=30)
-            load_time = time.time() - start_time
-            headers = response.headers
+            if self.offline:
+                # No load time for stored pages: score on headers and size only
+                load_time = None
+                headers = self.response_headers
+                soup = self.soup
+                page_size = len(self.page_content.encode('utf-8')) / 1024  # KB
+            else:
+                # Time a fresh connection, not a pooled keep-alive one, so load time
+                # still includes DNS, TCP and TLS setup
+                start_time = time.time()
+                response = requests.get(self.url, timeout=30)
+                load_time = time.time() - start_time
+                headers = response.headers
+                soup = BeautifulSoup(response.text, 'html.parser')
+                page_size = len(response.content) / 1024  # KB
             has_compression = 'gzip' in headers.get('content-encoding', '').lower()
             has_cache_control = 'cache-control' in headers
             has_keep_alive = headers.get('connection', '').lower() == 'keep-alive'
-            soup = BeautifulSoup(response.text, 'html.parser')
             scripts = len(soup.find_all('script'))
             styles = len(soup.find_all('link', rel='stylesheet'))
             images = len(soup.find_all('img'))
-            page_size = len(response.content) / 1024  # KB
             # Score: basic heuristic
             score = 0
-            total = 4
-            if load_time < 3:
+            total = 4 if load_time is not None else 3
+            if load_time is not None and load_time < 3:
                 score += 1
             if has_compression:
                 score += 1
@@ -466,7 +501,7 @@ class WebsiteAnalyzer:
                 score += 1
             percent = int((score / total) * 100)
             return {
-                "load_time": f"{load_time:.2f}s",
+                "load_time": f"{load_time:.2f}s" if load_time is not None else "n/a",
                 "page_size": f"{page_size:.2f}KB",
                 "resource_count": {
                     "scripts": scripts,
@@ -539,7 +574,10 @@ def main():
     
     print(f"Running analysis with AI features {'enabled' if use_ai else 'disabled'}")
     analyzer = WebsiteAnalyzer(url, use_ai=use_ai)
-    results = analyzer.run_analysis()
+    try:
+        results = analyzer.run_analysis()
+    finally:
+        analyzer.close()
     
     # Print results in a formatted way
     print("\nWebsite Analysis Results:")